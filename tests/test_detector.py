@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from ufd.core.detector import SHARD_MIN_FILES, plan_shards
+
+
+def _files(root: Path, directory: str, count: int) -> list[Path]:
+    return [root / directory / f"m{i}.py" for i in range(count)]
+
+
+def test_plan_shards_balances_directories(tmp_path: Path) -> None:
+    big, medium, small = (
+        _files(tmp_path, "big", SHARD_MIN_FILES * 3),
+        _files(tmp_path, "medium", SHARD_MIN_FILES * 2),
+        _files(tmp_path, "small", SHARD_MIN_FILES),
+    )
+    groups, group_of = plan_shards([*small, *medium, *big], tmp_path, jobs=2)
+
+    assert groups == [[tmp_path / "big"], [tmp_path / "medium", tmp_path / "small"]]
+    assert group_of[big[0].resolve().as_uri()] == 0
+    assert group_of[small[0].resolve().as_uri()] == 1
+
+
+def test_plan_shards_leaves_small_directories_and_root_files_unsharded(tmp_path: Path) -> None:
+    files = [
+        *_files(tmp_path, "a", SHARD_MIN_FILES),
+        *_files(tmp_path, "b", SHARD_MIN_FILES),
+        *_files(tmp_path, "scripts", 2),
+        tmp_path / "setup.py",
+    ]
+    groups, group_of = plan_shards(files, tmp_path, jobs=4)
+
+    assert sorted(map(sorted, groups)) == [[tmp_path / "a"], [tmp_path / "b"]]
+    assert (tmp_path / "scripts" / "m0.py").resolve().as_uri() not in group_of
+    assert (tmp_path / "setup.py").resolve().as_uri() not in group_of
+
+
+def test_plan_shards_needs_two_large_directories_and_jobs(tmp_path: Path) -> None:
+    files = [*_files(tmp_path, "a", SHARD_MIN_FILES), *_files(tmp_path, "docs", 3)]
+    assert plan_shards(files, tmp_path, jobs=4) == ([], {})
+
+    files = [*_files(tmp_path, "a", SHARD_MIN_FILES), *_files(tmp_path, "b", SHARD_MIN_FILES)]
+    assert plan_shards(files, tmp_path, jobs=1) == ([], {})
@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from ufd.core.detector import UnusedFunctionDetector
+from ufd.core.utils import find_imported_modules, module_names
+
+
+def test_module_names_are_every_path_suffix(tmp_path: Path) -> None:
+    assert module_names(tmp_path / "src" / "pkg" / "mod.py", tmp_path) == [
+        "src.pkg.mod",
+        "pkg.mod",
+        "mod",
+    ]
+    assert module_names(tmp_path / "pkg" / "__init__.py", tmp_path) == ["pkg"]
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        (b"import a.b as c, d\n", {"a", "a.b", "d"}),
+        (b"from pkg import (\n    x,\n    y,\n)\n", {"pkg", "pkg.x", "pkg.y"}),
+        (b"from pkg import \\\n    x\n", {"pkg", "pkg.x"}),
+        (b"try: from pkg import leaf\nexcept ImportError: pass\n", {"pkg", "pkg.leaf"}),
+        (b"if True: import m\n", {"m"}),
+        (b"x = 1; import m\n", {"m"}),
+        (b"def f():\n    import lazy\n", {"lazy"}),
+    ],
+)
+def test_find_imported_modules(source: bytes, expected: set[str]) -> None:
+    assert find_imported_modules(source, ()) == expected
+
+
+def test_find_imported_modules_resolves_relative_imports() -> None:
+    package = ("pkg", "sub")
+    assert find_imported_modules(b"from . import a\n", package) == {"pkg", "pkg.sub", "pkg.sub.a"}
+    assert find_imported_modules(b"from ..b import c\n", package) >= {"pkg.b", "pkg.b.c"}
+    assert find_imported_modules(b"from .... import x\n", package) == set()
+
+
+def test_find_imported_modules_rejects_unparseable_source() -> None:
+    with pytest.raises(SyntaxError):
+        find_imported_modules(b"import (\n", ())
+
+
+def test_imported_modules_include_directories_the_scan_skips(tmp_path: Path) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "leaf.py").write_text("def leaf_unused():\n    pass\n")
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "migrations" / "m2.py").write_text("from pkg.leaf import leaf_unused\n")
+    detector = UnusedFunctionDetector(lsp_server_cmd=[])
+
+    imported = asyncio.run(detector._imported_modules(tmp_path))
+    assert imported is not None
+    assert "pkg.leaf" in imported
+
+    (tmp_path / "broken.py").write_text("import (\n")
+    assert asyncio.run(detector._imported_modules(tmp_path)) is None
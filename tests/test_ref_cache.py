@@ -0,0 +1,56 @@
+import asyncio
+from pathlib import Path
+
+from ufd.core.detector import UnusedFunctionDetector
+from ufd.core.models import FunctionInfo
+from ufd.core.ref_cache import fingerprint_file, reference_keys
+
+
+def _func(path: Path, name: str) -> FunctionInfo:
+    return FunctionInfo(file_uri=path.as_uri(), name=name, start_line=0, start_char=4, end_line=1)
+
+
+def test_reference_keys_change_only_with_files_mentioning_the_name(tmp_path: Path) -> None:
+    mod = tmp_path / "mod.py"
+    mod.write_text("def target():\n    pass\n")
+    other = tmp_path / "other.py"
+    other.write_text("x = 1\n")
+    func = _func(mod, "target")
+
+    def key() -> object:
+        fingerprints = {path.as_uri(): fingerprint_file(path) for path in (mod, other)}
+        return reference_keys([func], fingerprints)[0]
+
+    before = key()
+    other.write_text("x = 2\n")
+    assert key() == before
+
+    other.write_text("from mod import target\ntarget()\n")
+    assert key() != before
+
+
+def test_reference_keys_without_fingerprint_is_none(tmp_path: Path) -> None:
+    assert reference_keys([_func(tmp_path / "gone.py", "target")], {}) == [None]
+
+
+def test_reference_keys_cover_directories_the_scan_skips(tmp_path: Path) -> None:
+    pkg = tmp_path / "pkg"
+    pkg.mkdir()
+    mod = pkg / "mod.py"
+    mod.write_text("def deep_unused():\n    pass\n")
+    func = _func(mod.resolve(), "deep_unused")
+    detector = UnusedFunctionDetector(lsp_server_cmd=[])
+
+    def key() -> object:
+        return asyncio.run(detector._reference_keys([func], tmp_path))[0]
+
+    before = key()
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "migrations" / "m1.py").write_text("from pkg.mod import deep_unused\n")
+    assert key() != before
+
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "vendored.py").write_text("deep_unused()\n")
+    after_migration = key()
+    (tmp_path / "node_modules" / "vendored.py").write_text("deep_unused(1)\n")
+    assert key() == after_migration
@@ -0,0 +1,68 @@
+import asyncio
+import socket
+from typing import Any, cast
+
+from ufd.core.transport import AsyncStreamTransport
+
+
+def _frame(body: bytes, extra_headers: bytes = b"") -> bytes:
+    return b"Content-Length: %d\r\n%b\r\n%b" % (len(body), extra_headers, body)
+
+
+def _read_all(data: bytes, limit: int = 2**16) -> list[dict[str, Any] | None]:
+    async def run() -> list[dict[str, Any] | None]:
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        # read_message never touches the writer
+        transport = AsyncStreamTransport(reader, cast(asyncio.StreamWriter, None))
+        messages = []
+        while (message := await transport.read_message()) is not None:
+            messages.append(message)
+        return [*messages, message]
+
+    return asyncio.run(run())
+
+
+def test_read_message_frames_consecutive_messages() -> None:
+    data = _frame(b'{"id":1}') + _frame('{"s":"é"}'.encode())
+    assert _read_all(data) == [{"id": 1}, {"s": "é"}, None]
+
+
+def test_read_message_accepts_other_headers() -> None:
+    content_type = b"Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n"
+    data = _frame(b'{"id":1}', content_type) + b"content-length:8\r\n\r\n" + b'{"id":2}'
+    assert _read_all(data) == [{"id": 1}, {"id": 2}, None]
+
+
+def test_read_message_skips_bad_and_diagnostics_messages() -> None:
+    diagnostics = b'{"jsonrpc":"2.0","method":"textDocument/publishDiagnostics","params":{}}'
+    data = (
+        b"Content-Type: text/plain\r\n\r\n"  # No Content-Length
+        + _frame(b"{not json")
+        + _frame(diagnostics)
+        + _frame(b'{"id":3}')
+    )
+    assert _read_all(data) == [{"id": 3}, None]
+
+
+def test_read_message_resyncs_after_overlong_garbage() -> None:
+    assert _read_all(b"x" * 200 + _frame(b'{"id":4}'), limit=64) == [{"id": 4}, None]
+
+
+def test_read_message_returns_none_on_truncated_body() -> None:
+    assert _read_all(_frame(b'{"id":5}')[:-1]) == [None]
+
+
+def test_send_round_trips_through_read_message() -> None:
+    async def run() -> dict[str, Any] | None:
+        left, right = socket.socketpair()
+        sender = AsyncStreamTransport(*await asyncio.open_unix_connection(sock=left))
+        receiver = AsyncStreamTransport(*await asyncio.open_unix_connection(sock=right))
+        await sender.send({"jsonrpc": "2.0", "id": 6, "result": ["é"]})
+        message = await receiver.read_message()
+        await sender.close()
+        await receiver.close()
+        return message
+
+    assert asyncio.run(run()) == {"jsonrpc": "2.0", "id": 6, "result": ["é"]}
@@ -0,0 +1,23 @@
+import pytest
+
+from ufd.core.utils import extract_functions
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("def f(): pass\n", [("f", 0, 4)]),
+        ("async  def  f():\n    pass\n", [("f", 0, 12)]),
+        ("\x0c\ndef f(): pass\n", [("f", 1, 4)]),
+        ('x = "\x85\u2028"\ndef f(): pass\n', [("f", 1, 4)]),
+        ("x = 1\r\ndef f(): pass\r\n\r\ndef g(): pass", [("f", 1, 4), ("g", 3, 4)]),
+    ],
+)
+def test_extract_functions_positions(source: str, expected: list[tuple[str, int, int]]) -> None:
+    functions = extract_functions(source, "file:///m.py")
+    assert [(f.name, f.start_line, f.start_char) for f in functions] == expected
+
+
+def test_extract_functions_skips_methods_and_nested_functions() -> None:
+    source = "class C:\n    def m(self): pass\n\ndef f():\n    def inner(): pass\n"
+    assert [f.name for f in extract_functions(source, "file:///m.py")] == ["f"]
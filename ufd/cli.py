@@ -2,11 +2,16 @@
 
 import asyncio
 import logging
+import os
 import shutil
+import signal
+import subprocess
 import sys
+import time
+from collections.abc import Coroutine
 from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, TypeVar
 
 import typer
 from rich.console import Console
@@ -17,11 +22,18 @@ from rich.progress import (
     TextColumn,
 )
 
+from ufd.core.daemon import LSPDaemon, connect_to_daemon, pid_path_for, socket_path_for
 from ufd.core.detector import UnusedFunctionDetector
+from ufd.core.models import ScanResult
 from ufd.output.formatters.enums import OutputFormat
 from ufd.output.formatters.formatter_factory import get_formatter
 from ufd.output.progress.callbacks import NoOpProgressCallback, RichProgressCallback
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional, the default asyncio loop is the fallback
+    uvloop = None
+
 app = typer.Typer(
     name="ufd",
     help="🔍 Find unused functions in Python codebases using LSP",
@@ -29,10 +41,23 @@ app = typer.Typer(
     add_completion=False,
 )
 
+daemon_app = typer.Typer(
+    help="Keep a warmed-up LSP server running between scans",
+    no_args_is_help=True,
+)
+app.add_typer(daemon_app, name="daemon")
+
 console = Console()
 
 DEFAULT_PATH = Path(".")
 
+LSP_SERVER_CMD = ["basedpyright-langserver", "--stdio"]
+
+# How long `ufd daemon start` waits for the initial workspace analysis
+DAEMON_START_TIMEOUT = 300
+
+T = TypeVar("T")
+
 
 @app.command()
 def check(
@@ -76,6 +101,29 @@ def check(
             help="Save results to file",
         ),
     ] = None,
+    fast: Annotated[
+        bool,
+        typer.Option(
+            "--fast",
+            help="Skip the LSP for names used elsewhere and never imported modules (less precise)",
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Analyze top-level directories with up to this many LSP servers in parallel",
+        ),
+    ] = 1,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-cache",
+            help="Ignore and don't update the on-disk caches of parsed files and references",
+        ),
+    ] = False,
     verbose: Annotated[
         bool,
         typer.Option(
@@ -95,6 +143,7 @@ def check(
         ufd ./my-project
         ufd --include-tests --output json
         ufd -p -o csv -f results.csv
+        ufd --fast ./large-project
         ufd --include-fastapi  # include FastAPI routes in analysis
     """
     if verbose:
@@ -102,12 +151,23 @@ def check(
     else:
         logging.basicConfig(level=logging.WARNING)
 
-    lsp_server = ["basedpyright-langserver", "--stdio"]
-
-    detector = UnusedFunctionDetector(
-        verbose=verbose,
-        lsp_server_cmd=lsp_server,
-    )
+    async def run_scan() -> ScanResult:
+        # Reuse a resident LSP server for this path when one is running
+        transport = await connect_to_daemon(path)
+        detector = UnusedFunctionDetector(
+            verbose=verbose,
+            lsp_server_cmd=LSP_SERVER_CMD,
+            use_cache=not no_cache,
+            fast=fast,
+            existing_transport=transport,
+            jobs=jobs,
+        )
+        return await detector.scan(
+            path=path,
+            include_tests=include_tests,
+            include_private=include_private,
+            progress_callback=progress_callback,
+        )
 
     progress = Progress(
         MofNCompleteColumn(),
@@ -126,14 +186,7 @@ def check(
         progress_callback = RichProgressCallback(progress, task_id)
 
     try:
-        result = asyncio.run(
-            detector.scan(
-                path=path,
-                include_tests=include_tests,
-                include_private=include_private,
-                progress_callback=progress_callback,
-            )
-        )
+        result = _run(run_scan())
     except Exception as e:
         console.print(f"[red]Error during scan: {e}[/red]")
         if verbose:
@@ -146,14 +199,11 @@ def check(
 
     if output_format == "tree":
         formatter.format(result)
+    elif output_file:
+        formatter.save(result, output_file)
+        console.print(f"[green]Results saved to {output_file}[/green]")
     else:
-        output = formatter.format(result)
-
-        if output_file:
-            _ = output_file.write_text(output, encoding="utf-8")
-            console.print(f"[green]Results saved to {output_file}[/green]")
-        else:
-            console.print(output)
+        console.print(formatter.format(result))
 
     if result.unused_functions:
         console.print(
@@ -163,6 +213,93 @@ def check(
     console.print("[green]✅ No unused functions found![/green]")
 
 
+@daemon_app.command("start")
+def daemon_start(
+    path: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            file_okay=False,
+            dir_okay=True,
+            help="Workspace the daemon analyzes",
+        ),
+    ] = DEFAULT_PATH,
+) -> None:
+    """Start a resident LSP server that `ufd check` reuses for this path."""
+    if sys.platform == "win32":
+        console.print("[red]The LSP daemon requires unix domain sockets[/red]")
+        raise typer.Exit(1)
+
+    if _daemon_pid(path) is not None:
+        console.print(f"[yellow]LSP daemon already running for {path}[/yellow]")
+        return
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "ufd", "daemon", "serve", str(path.resolve())],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    socket_path = socket_path_for(path)
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    with console.status("Waiting for the initial LSP analysis..."):
+        while not socket_path.exists():
+            if proc.poll() is not None:
+                console.print("[red]LSP daemon exited during startup[/red]")
+                raise typer.Exit(1)
+            if time.monotonic() > deadline:
+                console.print("[yellow]⚠ LSP daemon is still warming up[/yellow]")
+                return
+            time.sleep(0.2)
+
+    console.print(f"[green]✓ LSP daemon running for {path} (pid {proc.pid})[/green]")
+
+
+@daemon_app.command("stop")
+def daemon_stop(
+    path: Annotated[
+        Path,
+        typer.Argument(file_okay=False, dir_okay=True, help="Workspace the daemon analyzes"),
+    ] = DEFAULT_PATH,
+) -> None:
+    """Stop the resident LSP server for this path."""
+    pid = _daemon_pid(path)
+    if pid is None:
+        console.print(f"[yellow]No LSP daemon running for {path}[/yellow]")
+        return
+
+    os.kill(pid, signal.SIGTERM)
+    console.print(f"[green]✓ Stopped LSP daemon for {path}[/green]")
+
+
+@daemon_app.command("serve", hidden=True)
+def daemon_serve(
+    path: Annotated[Path, typer.Argument(file_okay=False, dir_okay=True)],
+) -> None:
+    """Run the LSP daemon in the foreground."""
+    logging.basicConfig(level=logging.INFO)
+    _run(LSPDaemon(path, LSP_SERVER_CMD).serve())
+
+
+def _run(main: Coroutine[Any, Any, T]) -> T:
+    """Run `main` on uvloop when it is installed, else on the default event loop."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
+
+
+def _daemon_pid(path: Path) -> int | None:
+    """Return the pid of the daemon running for `path`, if any."""
+    try:
+        pid = int(pid_path_for(path).read_text(encoding="utf-8"))
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
 @app.command("version")
 def cli_version() -> None:
     """Show version information."""
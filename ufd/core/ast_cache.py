@@ -0,0 +1,89 @@
+"""On-disk cache of functions extracted from Python files."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+
+from ufd.core.models import FunctionInfo
+from ufd.core.utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled layout of cached entries changes
+CACHE_VERSION = 5
+
+
+class ASTCache:
+    """
+    Cache of `extract_functions` results for one workspace.
+
+    Entries are keyed by resolved file path and only reused while the
+    file's modification time and size are unchanged.
+    """
+
+    def __init__(self, root_path: Path, cache_dir: Path | None = None) -> None:
+        root_key = hashlib.sha1(str(root_path.resolve()).encode("utf-8")).hexdigest()[:16]
+        self.cache_file = (cache_dir or get_cache_dir()) / "ast" / f"{root_key}.pkl"
+        self._entries: dict[str, tuple[int, int, list[FunctionInfo]]] = {}
+        self._seen: set[str] = set()
+        self._dirty = False
+
+    def load(self) -> None:
+        """Load cached entries from disk, ignoring missing or stale cache files."""
+        try:
+            with self.cache_file.open("rb") as f:
+                version, entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable AST cache {self.cache_file}: {e}")
+            return
+
+        if version == CACHE_VERSION:
+            self._entries = entries
+
+    def get(self, path: Path, stat: os.stat_result) -> list[FunctionInfo] | None:
+        """Return the cached functions for `path`, or None if missing or outdated."""
+        key = str(path)
+        self._seen.add(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        mtime_ns, size, functions = entry
+        if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+        return functions
+
+    def set(self, path: Path, stat: os.stat_result, functions: list[FunctionInfo]) -> None:
+        """Store the functions extracted from `path`."""
+        key = str(path)
+        self._seen.add(key)
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size, functions)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed."""
+        # Drop entries for files that have been deleted since they were cached
+        stale = [key for key in self._entries if key not in self._seen and not Path(key).exists()]
+        for key in stale:
+            del self._entries[key]
+
+        if not self._dirty and not stale:
+            return
+
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with tmp_file.open("wb") as f:
+                pickle.dump((CACHE_VERSION, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(self.cache_file)
+        except OSError as e:
+            logger.debug(f"Failed to write AST cache {self.cache_file}: {e}")
+            return
+
+        self._dirty = False
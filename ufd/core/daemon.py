@@ -0,0 +1,233 @@
+"""Resident LSP server shared across scans through a unix domain socket."""
+
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Any
+
+from ufd.core.detector import start_lsp_session
+from ufd.core.lsp_client import LSPClient
+from ufd.core.transport import AsyncStreamTransport
+from ufd.core.utils import get_cache_dir, iter_indexed_python_files
+
+logger = logging.getLogger(__name__)
+
+# LSP FileChangeType values for workspace/didChangeWatchedFiles
+FILE_CREATED = 1
+FILE_CHANGED = 2
+FILE_DELETED = 3
+
+
+def _daemon_dir(root_path: Path) -> Path:
+    root_key = hashlib.sha1(str(root_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return get_cache_dir() / "daemon" / root_key
+
+
+def socket_path_for(root_path: Path) -> Path:
+    """Return the socket a daemon serving `root_path` listens on."""
+    return _daemon_dir(root_path) / "lsp.sock"
+
+
+def pid_path_for(root_path: Path) -> Path:
+    """Return the file holding the pid of the daemon serving `root_path`."""
+    return _daemon_dir(root_path) / "daemon.pid"
+
+
+async def connect_to_daemon(root_path: Path) -> AsyncStreamTransport | None:
+    """Connect to the daemon serving `root_path`, or return None if none is running."""
+    if sys.platform == "win32":
+        return None
+    socket_path = socket_path_for(root_path)
+    if not socket_path.exists():
+        return None
+    try:
+        return await AsyncStreamTransport.open_unix(str(socket_path))
+    except OSError as e:
+        logger.debug(f"No LSP daemon listening on {socket_path}: {e}")
+        return None
+
+
+def _snapshot(root_path: Path) -> dict[Path, int]:
+    """Map every Python file the LSP server indexes to its modification time."""
+    snapshot = {}
+    for file_path in iter_indexed_python_files(root_path):
+        try:
+            snapshot[file_path.resolve()] = file_path.stat().st_mtime_ns
+        except OSError:
+            continue
+    return snapshot
+
+
+class LSPDaemon:
+    """
+    Keeps one warmed-up LSP server running and relays scan sessions to it.
+
+    Sessions are served one at a time. Request ids are remapped so that late
+    responses to a disconnected session are never delivered to the next one,
+    and files changed since the previous session are reported to the server
+    before a new session is relayed.
+    """
+
+    def __init__(self, root_path: Path, lsp_server_cmd: list[str]) -> None:
+        self.root_path = root_path.resolve()
+        self.lsp_server_cmd = lsp_server_cmd
+        self.socket_path = socket_path_for(self.root_path)
+        self.pid_path = pid_path_for(self.root_path)
+        self._server: AsyncStreamTransport | None = None
+        self._session: AsyncStreamTransport | None = None
+        self._session_lock = asyncio.Lock()
+        # Daemon request id -> (session, id the session used)
+        self._pending: dict[int, tuple[AsyncStreamTransport, Any]] = {}
+        self._ids = itertools.count(1 << 20)
+        self._mtimes: dict[Path, int] = {}
+        self._stopped = asyncio.Event()
+
+    async def serve(self) -> None:
+        """Start the LSP server, warm it up and serve sessions until stopped."""
+        self._write_pid_file()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stopped.set)
+
+        client = LSPClient(server_cmd=self.lsp_server_cmd)
+        server: asyncio.Server | None = None
+        pump_task: asyncio.Task[None] | None = None
+        try:
+            await client.connect()
+            await start_lsp_session(client, self.root_path)
+            self._mtimes = await asyncio.to_thread(_snapshot, self.root_path)
+            self._server = await client.detach()
+
+            pump_task = asyncio.create_task(self._pump_server())
+            pump_task.add_done_callback(lambda _: self._stopped.set())
+
+            self._remove_socket_file()
+            server = await asyncio.start_unix_server(
+                self._handle_session, path=str(self.socket_path)
+            )
+            logger.info(f"LSP daemon for {self.root_path} listening on {self.socket_path}")
+
+            await self._stopped.wait()
+        finally:
+            if server is not None:
+                server.close()
+            self._remove_socket_file()
+            self._remove_pid_file()
+            if pump_task is not None:
+                pump_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pump_task
+            if self._server is not None:
+                client.attach(self._server)
+            await client.shutdown()
+
+    def _write_pid_file(self) -> None:
+        self.pid_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pid_path.write_text(str(os.getpid()), encoding="utf-8")
+
+    def _remove_pid_file(self) -> None:
+        self.pid_path.unlink(missing_ok=True)
+
+    def _remove_socket_file(self) -> None:
+        self.socket_path.unlink(missing_ok=True)
+
+    async def _pump_server(self) -> None:
+        """Forward server messages to the active session."""
+        assert self._server is not None
+        while True:
+            message = await self._server.read_message()
+            if message is None:
+                logger.warning("LSP server closed its output, stopping daemon")
+                return
+
+            if "method" in message:
+                if "id" in message:
+                    # Server-to-client requests are not relayed
+                    continue
+                target = self._session
+            else:
+                msg_id = message.get("id")
+                pending = self._pending.pop(msg_id, None) if isinstance(msg_id, int) else None
+                if pending is None:
+                    continue
+                target, session_id = pending
+                message = {**message, "id": session_id}
+
+            if target is not None and target is self._session:
+                with contextlib.suppress(ConnectionError, OSError, RuntimeError):
+                    await target.send(message)
+
+    async def _handle_session(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Relay one scan session to the LSP server."""
+        async with self._session_lock:
+            session = AsyncStreamTransport(reader, writer)
+            try:
+                await self._sync_changed_files()
+                self._session = session
+                await self._relay_session(session)
+            except (ConnectionError, OSError) as e:
+                logger.debug(f"LSP daemon session failed: {e}")
+            finally:
+                self._session = None
+                self._pending = {
+                    daemon_id: pending
+                    for daemon_id, pending in self._pending.items()
+                    if pending[0] is not session
+                }
+                await session.close()
+
+    async def _relay_session(self, session: AsyncStreamTransport) -> None:
+        """Forward session messages to the server until the session ends."""
+        assert self._server is not None
+        while True:
+            message = await session.read_message()
+            if message is None:
+                return
+
+            method = message.get("method")
+            if method in ("shutdown", "exit"):
+                # The resident server outlives its sessions
+                return
+            if method in ("initialize", "initialized"):
+                continue
+
+            if "id" in message:
+                daemon_id = next(self._ids)
+                self._pending[daemon_id] = (session, message["id"])
+                message = {**message, "id": daemon_id}
+            await self._server.send(message)
+
+    async def _sync_changed_files(self) -> None:
+        """Tell the server about files created, changed or deleted since the last session."""
+        assert self._server is not None
+        mtimes = await asyncio.to_thread(_snapshot, self.root_path)
+        changes = [
+            {"uri": path.as_uri(), "type": FILE_DELETED}
+            for path in self._mtimes.keys() - mtimes.keys()
+        ]
+        for path, mtime_ns in mtimes.items():
+            previous = self._mtimes.get(path)
+            if previous is None:
+                changes.append({"uri": path.as_uri(), "type": FILE_CREATED})
+            elif previous != mtime_ns:
+                changes.append({"uri": path.as_uri(), "type": FILE_CHANGED})
+        self._mtimes = mtimes
+
+        if changes:
+            logger.debug(f"Reporting {len(changes)} changed files to the LSP server")
+            await self._server.send(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "workspace/didChangeWatchedFiles",
+                    "params": {"changes": changes},
+                }
+            )
@@ -1,13 +1,29 @@
 """Main unused function detector."""
 
+import asyncio
 import logging
+import multiprocessing
+import os
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from ufd.core.ast_cache import ASTCache
 from ufd.core.lsp_client import LSPClient
 from ufd.core.lsp_utils import has_framework_decorators
 from ufd.core.models import FunctionInfo, ScanResult
-from ufd.core.utils import extract_functions, iter_python_files
+from ufd.core.ref_cache import RefCache, RefKey, fingerprint_file, reference_keys
+from ufd.core.transport import AsyncStreamTransport
+from ufd.core.utils import (
+    count_identifiers,
+    extract_functions,
+    extract_functions_from_files,
+    find_imported_modules,
+    iter_indexed_python_files,
+    iter_python_files,
+    module_names,
+)
 from ufd.output.progress.callbacks import NoOpProgressCallback
 from ufd.output.progress.protocols import ProgressCallback
 
@@ -16,6 +32,103 @@ logger = logging.getLogger(__name__)
 
 noop_progress_callback = NoOpProgressCallback()
 
+# Parse at least this many uncached files in worker processes rather than threads;
+# below that, starting the workers costs more than it saves
+PROCESS_POOL_MIN_FILES = 256
+PROCESS_POOL_CHUNK_SIZE = 32
+
+# Top-level directories with fewer files than this get no LSP server of their own
+SHARD_MIN_FILES = 64
+
+# Files that are run or loaded by tools rather than imported by other modules
+ENTRY_POINT_FILES = {"__init__.py", "__main__.py", "conftest.py"}
+
+LSP_SETTINGS = {
+    "python": {
+        "analysis": {
+            "typeCheckingMode": "off",
+            "diagnosticMode": "workspace",
+        }
+    }
+}
+
+# Settings for a server that only answers queries and never checks the whole workspace
+INDEX_ONLY_LSP_SETTINGS = {
+    "python": {
+        "analysis": {
+            "typeCheckingMode": "off",
+            "diagnosticMode": "openFilesOnly",
+        }
+    }
+}
+
+
+async def start_lsp_session(
+    client: LSPClient,
+    root_path: Path,
+    workspace_folders: list[Path] | None = None,
+    index_only: bool = False,
+) -> None:
+    """
+    Initialize and configure a connected LSP server, then wait for its first analysis.
+
+    An `index_only` server skips the workspace-wide analysis and resolves
+    queries lazily, so there is nothing to wait for.
+    """
+    root_uri = root_path.resolve().as_uri()
+    folder_uris = [folder.resolve().as_uri() for folder in workspace_folders or []]
+    # Settings go out with initialize: a later didChangeConfiguration would make
+    # the server throw away its first analysis and start over
+    await client.initialize(
+        root_uri,
+        settings=INDEX_ONLY_LSP_SETTINGS if index_only else LSP_SETTINGS,
+        workspace_folders=folder_uris,
+    )
+
+    if not index_only:
+        # Wait for initial analysis to complete
+        await client.wait_for_analysis_complete()
+
+
+def plan_shards(
+    files: list[Path], root_path: Path, jobs: int
+) -> tuple[list[list[Path]], dict[str, int]]:
+    """
+    Split the top-level directories holding `files` into at most `jobs` balanced groups.
+
+    Also returns the group of each file by URI. Files directly under `root_path`,
+    and those in directories with fewer than `SHARD_MIN_FILES` files, belong to no
+    group and are left to the whole-workspace server. There are no groups unless
+    two directories can be split.
+    """
+    files_by_dir: dict[Path, list[Path]] = {}
+    for file_path in files:
+        parts = file_path.relative_to(root_path).parts
+        if len(parts) > 1:
+            files_by_dir.setdefault(root_path / parts[0], []).append(file_path)
+    # A server given a small workspace may never report its analysis as complete,
+    # and startup would wait for it until the timeout
+    files_by_dir = {
+        directory: dir_files
+        for directory, dir_files in files_by_dir.items()
+        if len(dir_files) >= SHARD_MIN_FILES
+    }
+
+    if jobs < 2 or len(files_by_dir) < 2:
+        return [], {}
+
+    # Largest directories first, each to the currently lightest group
+    groups: list[list[Path]] = [[] for _ in range(min(jobs, len(files_by_dir)))]
+    loads = [0] * len(groups)
+    group_of: dict[str, int] = {}
+    for directory, dir_files in sorted(files_by_dir.items(), key=lambda item: -len(item[1])):
+        lightest = loads.index(min(loads))
+        groups[lightest].append(directory)
+        loads[lightest] += len(dir_files)
+        for file_path in dir_files:
+            group_of[file_path.resolve().as_uri()] = lightest
+    return groups, group_of
+
 
 class UnusedFunctionDetector:
     """Main class for detecting unused functions using LSP."""
@@ -24,9 +137,19 @@ class UnusedFunctionDetector:
         self,
         lsp_server_cmd: list[str],
         verbose: bool = False,
+        use_cache: bool = True,
+        fast: bool = False,
+        *,
+        existing_transport: AsyncStreamTransport | None = None,
+        jobs: int = 1,
     ) -> None:
         self.verbose = verbose
         self.lsp_server_cmd = lsp_server_cmd
+        self.use_cache = use_cache
+        self.fast = fast
+        self.existing_transport = existing_transport
+        self.jobs = jobs
+        self._decorator_cache: dict[str, asyncio.Future[bool]] = {}
 
         logger.setLevel(logging.DEBUG if verbose else logging.INFO)
 
@@ -49,7 +172,7 @@ class UnusedFunctionDetector:
         Returns:
             ScanResult with unused functions found
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         if not path.exists():
             raise ValueError(f"Path does not exist: {path}")
@@ -57,13 +180,13 @@ class UnusedFunctionDetector:
         # Get all Python files to scan
         files = iter_python_files(path, include_tests=include_tests)
 
-        logger.debug(f"Found {len(files)} Python files to scan")
+        logger.debug("Found %d Python files to scan", len(files))
 
         unused_functions, total_functions = await self._scan_files(
             files, include_private, path, progress_callback
         )
 
-        scan_duration = time.time() - start_time
+        scan_duration = time.perf_counter() - start_time
 
         return ScanResult(
             total_functions=total_functions,
@@ -84,80 +207,396 @@ class UnusedFunctionDetector:
         unused_functions: list[FunctionInfo] = []
         total_functions = 0
 
-        progress_callback.update("Starting LSP client/server...")
-        try:
-            await client.connect()
-            root_uri = root_path.resolve().as_uri()
-            await client.initialize(root_uri)
-
-            # Configure LSP server
-            await client.notify(
-                "workspace/didChangeConfiguration",
-                params={
-                    "settings": {
-                        "python": {
-                            "analysis": {
-                                "typeCheckingMode": "off",
-                                "diagnosticMode": "workspace",
-                            }
-                        }
-                    }
-                },
+        # With several jobs, top-level directories are analyzed by separate servers
+        # while `client` only confirms the functions they find no references to
+        shards: list[list[Path]] = []
+        shard_of: dict[str, int] = {}
+        if self.jobs > 1 and self.existing_transport is None:
+            shards, shard_of = await asyncio.to_thread(plan_shards, files, root_path, self.jobs)
+            logger.debug("Splitting the workspace across %d LSP servers", len(shards))
+        shard_clients = [LSPClient(server_cmd=self.lsp_server_cmd) for _ in shards]
+
+        async def start_servers() -> None:
+            if self.existing_transport is not None:
+                # A resident server has already analyzed the workspace
+                client.attach(self.existing_transport)
+                return
+
+            await asyncio.gather(client.connect(), *[c.connect() for c in shard_clients])
+            logger.debug("Waiting for LSP analysis to complete...")
+            await asyncio.gather(
+                start_lsp_session(client, root_path, index_only=bool(shards)),
+                *[
+                    start_lsp_session(shard_client, shard[0], workspace_folders=shard)
+                    for shard, shard_client in zip(shards, shard_clients)
+                ],
             )
 
-            # Wait for initial analysis to complete
-            logger.debug("Waiting for LSP analysis to complete...")
+        ref_cache = RefCache() if self.use_cache else None
+
+        try:
+            # Read files and look up cached results while the LSP server analyzes the workspace
+            progress_callback.update("Starting LSP client/server...", completed=0, total=len(files))
+            servers_task = asyncio.create_task(start_servers())
+            try:
+                (
+                    funcs_to_check,
+                    total_functions,
+                    lexically_unused,
+                ) = await self._collect_functions(
+                    files, include_private, root_path, progress_callback
+                )
+
+                ref_keys: list[RefKey | None] = [None] * len(funcs_to_check)
+                if ref_cache is not None and not all(lexically_unused):
+                    progress_callback.update("Loading cached references...")
+                    ref_keys = await self._reference_keys(funcs_to_check, root_path)
+                    await asyncio.to_thread(
+                        ref_cache.load, [key for key in ref_keys if key is not None]
+                    )
+
+                if not servers_task.done():
+                    progress_callback.update("Waiting for LSP analysis to complete...")
+                await servers_task
+            finally:
+                servers_task.cancel()
+
+            # Fan out reference checks; each client caps how many requests are in flight
             progress_callback.update(
-                "Waiting for LSP analysis to complete...", completed=0, total=len(files)
+                "Checking references...", completed=0, total=len(funcs_to_check)
             )
 
-            await client.wait_for_analysis_complete()
+            async def check(func: FunctionInfo, ref_key: RefKey | None, known_unused: bool) -> bool:
+                shard = shard_of.get(func.file_uri)
+                if known_unused:
+                    is_unused = True
+                elif shard is None:
+                    is_unused = await self._check_func(func, client, ref_cache, ref_key)
+                else:
+                    is_unused = await self._check_func(
+                        func, shard_clients[shard], ref_cache, ref_key, index_client=client
+                    )
+                progress_callback.update(f"Checked {func.name}", advance=1)
+                return is_unused
+
+            check_tasks = [
+                asyncio.create_task(check(func, key, known_unused))
+                for func, key, known_unused in zip(funcs_to_check, ref_keys, lexically_unused)
+            ]
+            try:
+                results = await asyncio.gather(*check_tasks)
+            except BaseException:
+                # Don't leave the remaining checks running against a closing client
+                for task in check_tasks:
+                    task.cancel()
+                raise
+            if ref_cache is not None:
+                await asyncio.to_thread(ref_cache.save)
+            unused_functions = [
+                func for func, is_unused in zip(funcs_to_check, results) if is_unused
+            ]
 
-            # Process files sequentially like the old version
-            for file_path in files:
-                logger.debug(f"Processing {file_path}")
-                progress_callback.update(f"Processing {file_path.name}...", advance=1)
+        finally:
+            await asyncio.gather(client.shutdown(), *[c.shutdown() for c in shard_clients])
 
-                try:
-                    uri = file_path.resolve().as_uri()
-                    content = file_path.read_text(encoding="utf-8")
+        logger.debug("Found %d unused functions out of %d", len(unused_functions), total_functions)
 
-                    funcs_in_file = extract_functions(content, uri)
+        return unused_functions, total_functions
 
-                    # Filter private functions if requested
-                    if not include_private:
-                        funcs_in_file = [f for f in funcs_in_file if not f.name.startswith("_")]
+    async def _collect_functions(
+        self,
+        files: list[Path],
+        include_private: bool,
+        root_path: Path,
+        progress_callback: ProgressCallback,
+    ) -> tuple[list[FunctionInfo], int, list[bool]]:
+        """
+        Extract the functions to check from every file, and count all functions found.
 
-                    total_functions += len(funcs_in_file)
+        Also flags the functions fast mode found unused without needing the LSP.
+        """
+        ast_cache = ASTCache(root_path) if self.use_cache else None
+        if ast_cache is not None:
+            await asyncio.to_thread(ast_cache.load)
+
+        preparsed = await self._parse_in_processes(files, ast_cache, progress_callback)
+
+        async def read_file(
+            file_path: Path,
+        ) -> tuple[list[FunctionInfo], Counter[bytes], list[int]] | None:
+            logger.debug("Processing %s", file_path)
+            try:
+                result = await asyncio.to_thread(
+                    self._read_and_extract, file_path, ast_cache, include_private, preparsed
+                )
+            except Exception as e:
+                logger.warning("Failed to process %s: %s", file_path, e)
+                result = None
+            progress_callback.update(f"Processed {file_path.name}", advance=1)
+            return result
+
+        # Read and parse files in worker threads, keeping results in file order
+        file_results = await asyncio.gather(*[read_file(file_path) for file_path in files])
 
-                    # Check references for each function immediately
-                    for func in funcs_in_file:
-                        logger.debug(f"Checking references for {func.name} in {func.file_uri}")
+        total_functions = 0
+        funcs_to_check: list[FunctionInfo] = []
+        # Textual name counts, only gathered in fast mode
+        identifier_counts: Counter[bytes] = Counter()
+        local_name_counts: list[int] = []
+        in_file_name_counts: list[int] = []
+        in_unimported_module: list[bool] = []
+        imported_modules = await self._imported_modules(root_path) if self.fast else None
+        for file_path, file_result in zip(files, file_results):
+            if file_result is None:
+                continue
+            funcs_in_file, file_counts, local_counts = file_result
+            total_functions += len(funcs_in_file)
+            funcs_to_check.extend(funcs_in_file)
+            identifier_counts.update(file_counts)
+            local_name_counts.extend(local_counts)
+            if self.fast:
+                unimported = (
+                    imported_modules is not None
+                    and file_path.name not in ENTRY_POINT_FILES
+                    and not any(
+                        name in imported_modules for name in module_names(file_path, root_path)
+                    )
+                )
+                in_file_name_counts.extend(file_counts[f.name.encode()] for f in funcs_in_file)
+                in_unimported_module.extend(unimported for _ in funcs_in_file)
+
+        if ast_cache is not None:
+            await asyncio.to_thread(ast_cache.save)
+
+        lexically_unused = [False] * len(funcs_to_check)
+        if self.fast:
+            # A module nobody imports can only use its functions itself, as long as
+            # no other file mentions their names either; otherwise a name that also
+            # shows up outside its own definition is taken as used
+            kept: list[FunctionInfo] = []
+            lexically_unused = []
+            for func, local_count, in_file_count, unimported in zip(
+                funcs_to_check, local_name_counts, in_file_name_counts, in_unimported_module
+            ):
+                name_count = identifier_counts[func.name.encode()]
+                if unimported and not func.decorators and name_count <= in_file_count:
+                    if in_file_count <= local_count:
+                        kept.append(func)
+                        lexically_unused.append(True)
+                elif name_count <= local_count:
+                    kept.append(func)
+                    lexically_unused.append(False)
+            funcs_to_check = kept
+            logger.debug(
+                "Skipping LSP checks of %d textually referenced and %d never imported functions",
+                total_functions - len(funcs_to_check),
+                sum(lexically_unused),
+            )
 
-                        try:
-                            # Check if function has framework decorators that should be excluded
-                            if await has_framework_decorators(func, client):
-                                logger.debug(f"Skipping {func.name} - has framework decorators")
-                                continue
+        return funcs_to_check, total_functions, lexically_unused
 
-                            result = await client.references(
-                                text_document_uri=func.file_uri,
-                                line0=func.start_line,
-                                char0=func.start_char,
-                            )
+    async def _parse_in_processes(
+        self,
+        files: list[Path],
+        ast_cache: ASTCache | None,
+        progress_callback: ProgressCallback,
+    ) -> dict[Path, tuple[os.stat_result, list[FunctionInfo]]]:
+        """
+        Parse the files missing from the AST cache across worker processes.
 
-                            if not result:
-                                unused_functions.append(func)
+        Parsing is CPU-bound, so worker threads can't run it in parallel. Returns
+        the functions, and the file's stat before parsing, by resolved path,
+        leaving out files that failed to parse.
+        """
+        if len(files) < PROCESS_POOL_MIN_FILES or (os.cpu_count() or 1) < 2:
+            return {}
 
-                        except Exception as e:
-                            logger.warning(f"Failed to check references for {func.name}: {e}")
+        def find_uncached() -> dict[Path, os.stat_result]:
+            uncached = {}
+            for file_path in files:
+                resolved_path = file_path.resolve()
+                try:
+                    stat = resolved_path.stat()
+                except OSError:
+                    continue  # Reported when the file is processed
+                if ast_cache is None or ast_cache.get(resolved_path, stat) is None:
+                    uncached[resolved_path] = stat
+            return uncached
+
+        stats = await asyncio.to_thread(find_uncached)
+        uncached = list(stats)
+        if len(uncached) < PROCESS_POOL_MIN_FILES:
+            return {}
+
+        progress_callback.update(f"Parsing {len(uncached)} files...")
+        chunks = [
+            uncached[i : i + PROCESS_POOL_CHUNK_SIZE]
+            for i in range(0, len(uncached), PROCESS_POOL_CHUNK_SIZE)
+        ]
+        loop = asyncio.get_running_loop()
+        # Spawned workers don't inherit the event loop's threads the way forked ones would
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as executor:
+            chunk_results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(executor, extract_functions_from_files, chunk)
+                    for chunk in chunks
+                ]
+            )
 
-                except Exception as e:
-                    logger.warning(f"Failed to process {file_path}: {e}")
+        return {
+            path: (stats[path], funcs)
+            for chunk, results in zip(chunks, chunk_results)
+            for path, funcs in zip(chunk, results)
+            if funcs is not None
+        }
 
-        finally:
-            await client.shutdown()
+    def _read_and_extract(
+        self,
+        file_path: Path,
+        ast_cache: ASTCache | None,
+        include_private: bool,
+        preparsed: dict[Path, tuple[os.stat_result, list[FunctionInfo]]] | None = None,
+    ) -> tuple[list[FunctionInfo], Counter[bytes], list[int]]:
+        """
+        Read a file and extract the functions to check from it.
 
-        logger.debug(f"Found {len(unused_functions)} unused functions out of {total_functions}")
+        Runs in a worker thread. In fast mode, also returns the file's identifier
+        counts and how often each function's name occurs in its own definition.
+        """
+        resolved_path = file_path.resolve()
+        stat = resolved_path.stat()
+        funcs_in_file = ast_cache.get(resolved_path, stat) if ast_cache else None
+        if funcs_in_file is None and preparsed and resolved_path in preparsed:
+            parsed_stat, parsed_funcs = preparsed[resolved_path]
+            # Unless the file changed since it was handed to a worker process
+            if (parsed_stat.st_mtime_ns, parsed_stat.st_size) == (stat.st_mtime_ns, stat.st_size):
+                funcs_in_file = parsed_funcs
+                if ast_cache is not None:
+                    ast_cache.set(resolved_path, stat, funcs_in_file)
+
+        content = b""
+        if self.fast or funcs_in_file is None:
+            content = resolved_path.read_bytes()
+
+        if funcs_in_file is None:
+            uri = resolved_path.as_uri()
+            funcs_in_file = extract_functions(content.decode("utf-8"), uri)
+            if ast_cache is not None:
+                ast_cache.set(resolved_path, stat, funcs_in_file)
+
+        # Filter private functions if requested
+        if not include_private:
+            funcs_in_file = [f for f in funcs_in_file if not f.name.startswith("_")]
+
+        if not self.fast:
+            return funcs_in_file, Counter(), []
+
+        lines = content.split(b"\n")
+        local_counts = [
+            count_identifiers(b"\n".join(lines[f.start_line : f.end_line + 1]))[f.name.encode()]
+            for f in funcs_in_file
+        ]
+        return funcs_in_file, count_identifiers(content), local_counts
+
+    async def _imported_modules(self, root_path: Path) -> set[str] | None:
+        """
+        Collect the modules imported anywhere in the workspace, tests included.
 
-        return unused_functions, total_functions
+        Returns None when some file's imports are unknown because it couldn't be
+        read or parsed, as any module might then be imported.
+        """
+        # Imports may come from any file the LSP server indexes, not just scanned ones
+        workspace_files = iter_indexed_python_files(root_path)
+
+        def read_imports(file_path: Path) -> set[str]:
+            package = file_path.relative_to(root_path).parent.parts
+            return find_imported_modules(file_path.read_bytes(), package)
+
+        async def imports_of(file_path: Path) -> set[str] | None:
+            try:
+                return await asyncio.to_thread(read_imports, file_path)
+            except (OSError, SyntaxError, ValueError) as e:
+                logger.debug("Failed to read imports of %s: %s", file_path, e)
+                return None
+
+        results = await asyncio.gather(*[imports_of(path) for path in workspace_files])
+        imports = [result for result in results if result is not None]
+        if len(imports) < len(results):
+            return None
+        return set().union(*imports)
+
+    async def _reference_keys(
+        self, funcs: list[FunctionInfo], root_path: Path
+    ) -> list[RefKey | None]:
+        """Fingerprint every file the LSP server indexes and key each function's check."""
+        # References may come from any file in the workspace, not just scanned ones
+        workspace_files = iter_indexed_python_files(root_path)
+
+        def fingerprint_resolved(file_path: Path) -> tuple[str, tuple[str, frozenset[bytes]]]:
+            resolved_path = file_path.resolve()
+            return resolved_path.as_uri(), fingerprint_file(resolved_path)
+
+        async def fingerprint(file_path: Path) -> tuple[str, tuple[str, frozenset[bytes]]] | None:
+            try:
+                return await asyncio.to_thread(fingerprint_resolved, file_path)
+            except OSError as e:
+                logger.debug("Failed to fingerprint %s: %s", file_path, e)
+                return None
+
+        results = await asyncio.gather(*[fingerprint(path) for path in workspace_files])
+        fingerprints = dict(result for result in results if result is not None)
+        return reference_keys(funcs, fingerprints)
+
+    async def _check_func(
+        self,
+        func: FunctionInfo,
+        client: LSPClient,
+        ref_cache: RefCache | None = None,
+        ref_key: RefKey | None = None,
+        index_client: LSPClient | None = None,
+    ) -> bool:
+        """
+        Return whether a function has no references in the workspace.
+
+        When `client` only analyzes part of the workspace, a function it finds
+        no references to is confirmed against the whole-workspace `index_client`.
+        """
+        logger.debug("Checking references for %s in %s", func.name, func.file_uri)
+
+        if ref_cache is not None and ref_key is not None:
+            cached = ref_cache.get(ref_key)
+            if cached is not None:
+                logger.debug("Using cached references for %s", func.name)
+                return cached
+
+        try:
+            result = await client.references(
+                text_document_uri=func.file_uri,
+                line0=func.start_line,
+                char0=func.start_char,
+            )
+            if not result and index_client is not None:
+                result = await index_client.references(
+                    text_document_uri=func.file_uri,
+                    line0=func.start_line,
+                    char0=func.start_char,
+                )
+
+            # Framework decorators only matter for otherwise unused functions, so
+            # most functions never need a hover
+            if (
+                not result
+                and func.decorators
+                and await has_framework_decorators(func, client, self._decorator_cache)
+            ):
+                logger.debug("Skipping %s - has framework decorators", func.name)
+                return False
+
+        except Exception as e:
+            logger.warning("Failed to check references for %s: %s", func.name, e)
+            return False
+
+        is_unused = not result
+        if ref_cache is not None and ref_key is not None:
+            ref_cache.set(ref_key, is_unused)
+        return is_unused
@@ -3,23 +3,39 @@ import logging
 import os
 from typing import Any
 
-from ufd.core.transport import AsyncStdioTransport
+from ufd.core.transport import AsyncStdioTransport, AsyncStreamTransport
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on requests awaiting the LSP server at the same time
+MAX_CONCURRENT_REQUESTS = 64
+
+# Seconds to wait for a response, and how often overdue requests are looked for
+REQUEST_TIMEOUT = 60
+DEADLINE_SWEEP_INTERVAL = 1
+
 
 class LSPClient:
     """Simple JSON-RPC client for Language Server Protocol."""
 
     def __init__(self, server_cmd: list[str]) -> None:
         self.server_cmd = server_cmd
-        self.transport: AsyncStdioTransport | None = None
-        self._response_futures: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self.transport: AsyncStreamTransport | None = None
+        # Pending responses and their deadlines, indexed by request id offset by
+        # _futures_base_id. Ids are dense and monotonic, so a list beats a dict.
+        self._response_futures: list[tuple[asyncio.Future[dict[str, Any]], float] | None] = []
+        self._futures_base_id = 1
+        self._pending_requests = 0
         self._reader_task: asyncio.Task[None] | None = None
+        self._deadline_task: asyncio.Task[None] | None = None
         self._id = 0
         self.proc: asyncio.subprocess.Process | None = None
         self._notification_handlers: dict[str, Any] = {}
         self._analysis_complete_event = asyncio.Event()
+        self._settings: dict[str, Any] = {}
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Side-effect free requests in flight, keyed by method and position
+        self._inflight: dict[tuple[Any, ...], asyncio.Task[Any]] = {}
 
     async def _send_result(self, id_: int, result: Any = None) -> None:
         """Send a result response (not typically used by clients)."""
@@ -37,8 +53,28 @@ class LSPClient:
         )
         if self.proc.returncode is not None:
             raise RuntimeError("Failed to start LSP server")
-        self.transport = AsyncStdioTransport(self.proc)
+        self.attach(AsyncStdioTransport(self.proc))
+
+    def attach(self, transport: AsyncStreamTransport) -> None:
+        """Use an already established transport, e.g. to a resident LSP server."""
+        self.transport = transport
         self._reader_task = asyncio.create_task(self._reader())
+        self._deadline_task = asyncio.create_task(self._expire_overdue_requests())
+
+    async def detach(self) -> AsyncStreamTransport:
+        """Stop reading from the transport and hand it over to the caller."""
+        if self.transport is None:
+            raise RuntimeError("Not connected")
+        for task in (self._reader_task, self._deadline_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reader_task = self._deadline_task = None
+        transport, self.transport = self.transport, None
+        return transport
 
     async def _reader(self) -> None:
         """Reads messages from the server and dispatches them."""
@@ -46,26 +82,61 @@ class LSPClient:
             message = await self.transport.read_message()
             if message is None:
                 break
-            if "id" in message:
-                msg_id = message["id"]
-                fut = self._response_futures.get(msg_id)
+            if "method" in message:
+                method = message["method"]
+                if "id" in message:
+                    await self._handle_server_request(
+                        message["id"], method, message.get("params", {})
+                    )
+                else:
+                    # Handle notifications
+                    await self._handle_notification(method, message.get("params", {}))
+            elif isinstance(message.get("id"), int):
+                fut = self._pop_response_future(message["id"])
                 if fut and not fut.done():
                     fut.set_result(message)
-            elif "method" in message:
-                # Handle notifications
-                method = message["method"]
-                await self._handle_notification(method, message.get("params", {}))
 
         # If the reader exits, notify all pending futures
-        for future in self._response_futures.values():
-            if not future.done():
-                future.set_exception(RuntimeError("LSP connection lost"))
+        for slot in self._response_futures:
+            if slot is not None and not slot[0].done():
+                slot[0].set_exception(RuntimeError("LSP connection lost"))
+
+    async def _expire_overdue_requests(self) -> None:
+        """Fail requests past their deadline, with one timer for all of them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(DEADLINE_SWEEP_INTERVAL)
+            now = loop.time()
+            for slot in self._response_futures:
+                if slot is not None and slot[1] < now and not slot[0].done():
+                    slot[0].set_exception(TimeoutError())
 
     def _next_id(self) -> int:
         """Get the next request ID."""
         self._id += 1
         return self._id
 
+    def _pop_response_future(self, msg_id: int) -> asyncio.Future[dict[str, Any]] | None:
+        """Take the future waiting on `msg_id` out of its slot, if any."""
+        index = msg_id - self._futures_base_id
+        if not 0 <= index < len(self._response_futures):
+            return None
+        slot = self._response_futures[index]
+        if slot is None:
+            return None
+        self._response_futures[index] = None
+        self._pending_requests -= 1
+        return slot[0]
+
+    def _compact_response_futures(self) -> None:
+        """Drop the resolved prefix of the slot list once it is mostly empty."""
+        slots = self._response_futures
+        if len(slots) < 64 or self._pending_requests * 5 > len(slots):
+            return
+        first_pending = next((i for i, slot in enumerate(slots) if slot is not None), len(slots))
+        del slots[:first_pending]
+        self._futures_base_id += first_pending
+
     async def request(
         self,
         method: str,
@@ -75,24 +146,44 @@ class LSPClient:
         if self.transport is None:
             raise RuntimeError("Not connected")
 
-        msg_id = self._next_id()
-        future = asyncio.get_event_loop().create_future()
-        self._response_futures[msg_id] = future
+        async with self._request_slots:
+            loop = asyncio.get_running_loop()
+            msg_id = self._next_id()
+            future = loop.create_future()
+            self._response_futures.append((future, loop.time() + REQUEST_TIMEOUT))
+            self._pending_requests += 1
 
-        await self.transport.send(
-            {"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params or {}}
-        )
+            # The slot is released on every path, including a failed send or cancellation
+            try:
+                await self.transport.send(
+                    {"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params or {}}
+                )
+                response = await future
+            except TimeoutError:
+                raise TimeoutError(f"Timed out waiting for {method}")
+            finally:
+                self._pop_response_future(msg_id)
+                self._compact_response_futures()
 
-        try:
-            response = await asyncio.wait_for(future, timeout=60)
-            if "error" in response:
-                raise RuntimeError(f"LSP error for {method}: {response['error']}")
-            return response.get("result", {})
-        except TimeoutError:
-            raise TimeoutError(f"Timed out waiting for {method}")
-        finally:
-            if msg_id in self._response_futures:
-                del self._response_futures[msg_id]
+        if "error" in response:
+            raise RuntimeError(f"LSP error for {method}: {response['error']}")
+        return response.get("result", {})
+
+    async def _request_once(self, key: tuple[Any, ...], method: str, params: dict[str, Any]) -> Any:
+        """Send a request, or join the identical one already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.request(method, params=params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(key, done))
+        # Shielded, so that one caller giving up doesn't fail the others
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: tuple[Any, ...], task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every caller gave up
 
     async def notify(self, method: str, params: dict[str, Any] | None = None) -> None:
         """Send a notification (no response expected)."""
@@ -102,29 +193,48 @@ class LSPClient:
 
     async def _handle_notification(self, method: str, params: dict[str, Any]) -> None:
         """Handle incoming notifications from the server."""
-        if method == "textDocument/publishDiagnostics":
-            return
-        logger.debug(f"Received notification: {method} with params: {params}")
-
-        if method == "pyright/endProgress":
-            # basedpyright/pyright sends this when analysis is complete
-            self._analysis_complete_event.set()
-            logger.info("Analysis complete")
-        elif method == "pyright/beginProgress":
-            logger.debug("Analysis started")
-        elif method == "pyright/reportProgress":
-            logger.debug(f"Analysis progress: {params}")
-        elif method == "textDocument/publishDiagnostics":
-            # Diagnostics published - analysis is progressing/complete for this file
-            uri = params.get("uri", "unknown file")
-            diagnostics = params.get("diagnostics", [])
-            logger.debug(f"Diagnostics published for {uri}: {len(diagnostics)} items")
+        match method:
+            case "textDocument/publishDiagnostics":
+                # By far the most frequent notification, and never needed
+                return
+            case "pyright/endProgress":
+                # basedpyright/pyright sends this when analysis is complete
+                self._analysis_complete_event.set()
+                logger.info("Analysis complete")
+            case "pyright/beginProgress":
+                logger.debug("Analysis started")
+            case "pyright/reportProgress":
+                logger.debug("Analysis progress: %s", params)
+            case _:
+                logger.debug("Received notification: %s with params: %s", method, params)
 
         # Call custom handlers if registered
         handler = self._notification_handlers.get(method)
         if handler:
             await handler(params)
 
+    async def _handle_server_request(self, id_: int, method: str, params: dict[str, Any]) -> None:
+        """Answer requests the server sends to the client."""
+        match method:
+            case "workspace/configuration":
+                # Serve settings on demand so the first analysis already uses them
+                items = params.get("items", [])
+                await self._send_result(id_, [self._settings_section(item) for item in items])
+            case _:
+                logger.debug("Received server request: %s with params: %s", method, params)
+                await self._send_result(id_, None)
+
+    def _settings_section(self, item: dict[str, Any]) -> Any:
+        """Look up a dotted configuration section, e.g. "python.analysis"."""
+        section: Any = self._settings
+        for key in (item.get("section") or "").split("."):
+            if not key:
+                continue
+            if not isinstance(section, dict) or key not in section:
+                return None
+            section = section[key]
+        return section
+
     def register_notification_handler(self, method: str, handler: Any) -> None:
         """Register a custom notification handler."""
         self._notification_handlers[method] = handler
@@ -133,24 +243,36 @@ class LSPClient:
         """Wait for analysis to complete."""
         try:
             await asyncio.wait_for(self._analysis_complete_event.wait(), timeout=60)
-        except TimeoutError:
+        except asyncio.TimeoutError:  # Not yet the builtin TimeoutError on Python 3.10
             logger.warning("Timeout waiting for analysis to complete")
         finally:
             self._analysis_complete_event.clear()
 
-    async def initialize(self, root_uri: str) -> dict[str, Any]:
-        """Initialize the LSP server."""
+    async def initialize(
+        self,
+        root_uri: str,
+        settings: dict[str, Any] | None = None,
+        workspace_folders: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Initialize the LSP server, handing it `settings` before its first analysis."""
+        self._settings = settings or {}
+        if workspace_folders:
+            folders = [{"uri": uri, "name": uri.rsplit("/", 1)[-1]} for uri in workspace_folders]
+        else:
+            folders = [{"uri": root_uri, "name": "workspace"}]
         params = {
             "processId": os.getpid(),
             "clientInfo": {"name": "unused-function-detector", "version": "0.1.0"},
             "rootUri": root_uri,
-            "workspaceFolders": [{"uri": root_uri, "name": "workspace"}],
+            "workspaceFolders": folders,
+            "initializationOptions": self._settings,
             "capabilities": {
                 "textDocument": {
                     "references": {"dynamicRegistration": True},
                     "hover": {"dynamicRegistration": True},
+                    "publishDiagnostics": {"relatedInformation": False},
                 },
-                "workspace": {"workspaceFolders": True},
+                "workspace": {"workspaceFolders": True, "configuration": True},
             },
         }
         result = await self.request("initialize", params=params)
@@ -182,7 +304,8 @@ class LSPClient:
             "context": {"includeDeclaration": include_declaration},
         }
 
-        result = await self.request("textDocument/references", params=params)
+        key = ("textDocument/references", text_document_uri, line0, char0, include_declaration)
+        result = await self._request_once(key, "textDocument/references", params)
 
         if result is None:
             return []
@@ -210,13 +333,15 @@ class LSPClient:
             "position": {"line": line0, "character": char0},
         }
 
-        result = await self.request("textDocument/hover", params=params)
+        key = ("textDocument/hover", text_document_uri, line0, char0)
+        result = await self._request_once(key, "textDocument/hover", params)
         return result if result else None
 
     async def shutdown(self) -> None:
         """Shutdown the LSP connection."""
-        if self._reader_task is not None:
-            self._reader_task.cancel()
+        for task in (self._reader_task, self._deadline_task, *self._inflight.values()):
+            if task is not None:
+                task.cancel()
         try:
             await self.notify("shutdown")
         except Exception:
@@ -1,6 +1,9 @@
 """LSP-specific utility functions."""
 
+import asyncio
+import functools
 import logging
+import re
 
 from ufd.core.models import DecoratorInfo, FunctionInfo
 from ufd.core.protocols import LSPClientProtocol
@@ -9,7 +12,10 @@ logger = logging.getLogger(__name__)
 
 
 async def check_decorator_types(
-    decorators: list[DecoratorInfo], file_uri: str, lsp_client: LSPClientProtocol
+    decorators: tuple[DecoratorInfo, ...],
+    file_uri: str,
+    lsp_client: LSPClientProtocol,
+    cache: dict[str, asyncio.Future[bool]] | None = None,
 ) -> dict[str, bool]:
     """
     Check the types of decorators using LSP hover to identify framework decorators.
@@ -18,63 +24,119 @@ async def check_decorator_types(
         decorators: List of decorator information
         file_uri: URI of the file being analyzed
         lsp_client: LSP client for hover requests
+        cache: Optional verdicts keyed by decorator name, shared across calls so
+            a decorator used on many functions is only hovered once, even by
+            checks running at the same time
 
     Returns:
         Dictionary mapping decorator names to whether they are framework decorators
     """
-    decorator_types = {}
-
+    loop = asyncio.get_running_loop()
+    verdicts: dict[str, asyncio.Future[bool]] = {}
+    to_hover: dict[str, DecoratorInfo] = {}
     for decorator in decorators:
-        try:
-            # Get hover information for the decorator
-            hover_result = await lsp_client.hover(
-                file_uri, decorator.start_line, decorator.start_char
+        if decorator.name in verdicts:
+            continue
+        verdict = cache.get(decorator.name) if cache is not None else None
+        if verdict is None:
+            verdict = loop.create_future()
+            if cache is not None:
+                cache[decorator.name] = verdict
+            to_hover[decorator.name] = decorator
+        verdicts[decorator.name] = verdict
+
+    try:
+        # Send every hover at once; responses are matched back to requests by id
+        hover_results = await asyncio.gather(
+            *[
+                lsp_client.hover(file_uri, decorator.start_line, decorator.start_char)
+                for decorator in to_hover.values()
+            ],
+            return_exceptions=True,
+        )
+    except BaseException:
+        # Don't leave other checks waiting on hovers that were never answered
+        for name in to_hover:
+            if cache is not None:
+                cache.pop(name, None)
+            verdicts[name].cancel()
+        raise
+
+    for decorator, hover_result in zip(to_hover.values(), hover_results):
+        if isinstance(hover_result, BaseException):
+            logger.debug(
+                "Failed to check decorator %s via LSP hover: %s", decorator.name, hover_result
             )
-
-            if not hover_result or not hover_result.get("contents"):
-                decorator_types[decorator.name] = False
-                continue
-
-            # Extract the hover content
-            contents = hover_result["contents"]
-            if isinstance(contents, dict) and "value" in contents:
-                hover_text = contents["value"]
-            elif isinstance(contents, list):
-                hover_text = " ".join(str(item) for item in contents)
-            else:
-                hover_text = str(contents)
-
-            # Check if hover text indicates a framework decorator
-            decorator_types[decorator.name] = is_framework_decorator(hover_text)
-
-        except Exception as e:
-            logger.debug(f"Failed to check decorator {decorator.name} via LSP hover: {e}")
-            decorator_types[decorator.name] = False
-
-    return decorator_types
-
-
+            # A failed hover is retried by the next function using this decorator
+            if cache is not None:
+                cache.pop(decorator.name, None)
+            verdicts[decorator.name].set_result(False)
+            continue
+
+        if not hover_result or not hover_result.get("contents"):
+            verdicts[decorator.name].set_result(False)
+            continue
+
+        # Extract the hover content
+        contents = hover_result["contents"]
+        if isinstance(contents, dict) and "value" in contents:
+            hover_text = contents["value"]
+        elif isinstance(contents, list):
+            hover_text = " ".join(str(item) for item in contents)
+        else:
+            hover_text = str(contents)
+
+        # Check if hover text indicates a framework decorator
+        verdicts[decorator.name].set_result(is_framework_decorator(hover_text))
+
+    # Shielded, so that cancelling this check doesn't cancel a verdict other checks share
+    return {name: await asyncio.shield(verdict) for name, verdict in verdicts.items()}
+
+
+# Framework-specific type indicators
+FRAMEWORK_INDICATORS = (
+    "apirouter",  # FastAPI
+    "fastapi",  # FastAPI
+    "typer",  # Typer CLI
+    "click",  # Click CLI
+    "command",  # Generic command decorators
+)
+
+# One case-insensitive scan for all indicators, without a lowercased copy
+_FRAMEWORK_RE = re.compile("|".join(map(re.escape, FRAMEWORK_INDICATORS)), re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
 def is_framework_decorator(hover_text: str) -> bool:
-    hover_text_lower = hover_text.lower()
+    # Check if any framework indicators are present
+    return _FRAMEWORK_RE.search(hover_text) is not None
 
-    # Framework-specific type indicators
-    framework_indicators = [
-        "apirouter",  # FastAPI
-        "fastapi",  # FastAPI
-        "typer",  # Typer CLI
-        "click",  # Click CLI
-        "command",  # Generic command decorators
-    ]
 
-    # Check if any framework indicators are present
-    return any(indicator in hover_text_lower for indicator in framework_indicators)
+async def has_framework_decorators(
+    func: FunctionInfo,
+    lsp_client: LSPClientProtocol,
+    cache: dict[str, asyncio.Future[bool]] | None = None,
+) -> bool:
+    """
+    Check whether a function is decorated with a framework decorator.
 
+    Args:
+        func: Function to check
+        lsp_client: LSP client for hover requests
+        cache: Optional verdicts keyed by decorator name, see `check_decorator_types`
 
-async def has_framework_decorators(func: FunctionInfo, lsp_client: LSPClientProtocol) -> bool:
+    Returns:
+        True if any of the function's decorators is a framework decorator
+    """
     if not func.decorators:
         return False
 
-    decorator_types = await check_decorator_types(func.decorators, func.file_uri, lsp_client)
+    # Decorator names that already mention a framework, like `click.command`
+    # or `app.command`, need no hover
+    if any(is_framework_decorator(decorator.name) for decorator in func.decorators):
+        return True
+
+    decorator_types = await check_decorator_types(func.decorators, func.file_uri, lsp_client, cache)
 
     # Check if any decorator is a framework decorator
-    return any(is_framework for _, is_framework in decorator_types.items())
+    return any(decorator_types.values())
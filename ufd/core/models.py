@@ -1,9 +1,10 @@
 """Data models."""
 
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
 
 
-class DecoratorInfo(BaseModel):
+@dataclass(slots=True)
+class DecoratorInfo:
     """Information about a function decorator."""
 
     name: str
@@ -11,17 +12,20 @@ class DecoratorInfo(BaseModel):
     start_char: int
 
 
-class FunctionInfo(BaseModel):
+@dataclass(slots=True)
+class FunctionInfo:
     """Information about a function found in code."""
 
     file_uri: str
     name: str
     start_line: int
     start_char: int
-    decorators: list[DecoratorInfo] = Field(default_factory=list)
+    end_line: int
+    decorators: tuple[DecoratorInfo, ...] = ()
 
 
-class ScanResult(BaseModel):
+@dataclass(slots=True)
+class ScanResult:
     """Results of scanning for unused functions."""
 
     total_functions: int
@@ -0,0 +1,160 @@
+"""On-disk cache of reference check results."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from ufd.core.models import FunctionInfo
+from ufd.core.utils import IDENTIFIER_RE, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the meaning of cached results changes
+CACHE_VERSION = 1
+
+# Results not looked up for this long are dropped
+MAX_ENTRY_AGE = 30 * 24 * 60 * 60
+
+# (content hash, function name, line, char, hash of the files mentioning the name)
+RefKey = tuple[str, str, int, int, str]
+
+
+def fingerprint_file(path: Path) -> tuple[str, frozenset[bytes]]:
+    """Return the content hash of a file and the identifiers it mentions."""
+    content = path.read_bytes()
+    content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return content_hash, frozenset(IDENTIFIER_RE.findall(content))
+
+
+def reference_keys(
+    funcs: list[FunctionInfo],
+    fingerprints: dict[str, tuple[str, frozenset[bytes]]],
+) -> list[RefKey | None]:
+    """
+    Build the cache key of each function's reference check.
+
+    `fingerprints` maps the URI of every file in the workspace to the result of
+    `fingerprint_file`. A reference check can only change when a file mentioning
+    the function's name changes, so the key covers the hashes of all of them.
+    """
+    names = {func.name.encode() for func in funcs}
+    mentions: defaultdict[bytes, list[str]] = defaultdict(list)
+    for uri in sorted(fingerprints):
+        for name in fingerprints[uri][1] & names:
+            mentions[name].append(uri)
+
+    dependency_hashes: dict[bytes, str] = {}
+    keys: list[RefKey | None] = []
+    for func in funcs:
+        fingerprint = fingerprints.get(func.file_uri)
+        if fingerprint is None:
+            keys.append(None)
+            continue
+
+        name = func.name.encode()
+        dependency_hash = dependency_hashes.get(name)
+        if dependency_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for uri in mentions[name]:
+                digest.update(f"{uri}\0{fingerprints[uri][0]}\0".encode())
+            dependency_hash = dependency_hashes[name] = digest.hexdigest()
+
+        keys.append((fingerprint[0], func.name, func.start_line, func.start_char, dependency_hash))
+    return keys
+
+
+class RefCache:
+    """
+    Cache of reference check results, shared by all workspaces.
+
+    A result is reused only while the function's file and every file
+    mentioning its name are byte-for-byte unchanged.
+    """
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.cache_file = (cache_dir or get_cache_dir()) / "refs.db"
+        self._results: dict[RefKey, bool] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.cache_file, timeout=5)
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        if version != CACHE_VERSION:
+            conn.execute("DROP TABLE IF EXISTS refs")
+            conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS refs (
+                content_hash TEXT NOT NULL,
+                name TEXT NOT NULL,
+                line INTEGER NOT NULL,
+                char INTEGER NOT NULL,
+                dependency_hash TEXT NOT NULL,
+                unused INTEGER NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, name, line, char)
+            )
+            """
+        )
+        return conn
+
+    def load(self, keys: list[RefKey]) -> None:
+        """Fetch the cached results for `keys` from disk, ignoring an unreadable cache."""
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Ignoring unreadable reference cache {self.cache_file}: {e}")
+            return
+
+        try:
+            for key in keys:
+                row = conn.execute(
+                    """
+                    SELECT dependency_hash, unused FROM refs
+                    WHERE content_hash = ? AND name = ? AND line = ? AND char = ?
+                    """,
+                    key[:4],
+                ).fetchone()
+                if row is not None and row[0] == key[4]:
+                    self._results[key] = bool(row[1])
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to read reference cache {self.cache_file}: {e}")
+        finally:
+            conn.close()
+
+    def get(self, key: RefKey) -> bool | None:
+        """Return whether the cached check found the function unused, or None on a miss."""
+        return self._results.get(key)
+
+    def set(self, key: RefKey, unused: bool) -> None:
+        """Store the result of a reference check."""
+        self._results[key] = unused
+
+    def save(self) -> None:
+        """Write this scan's results to disk, dropping ones unused for a long time."""
+        if not self._results:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Failed to open reference cache {self.cache_file}: {e}")
+            return
+
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*key, unused, now) for key, unused in self._results.items()],
+                )
+                conn.execute("DELETE FROM refs WHERE used_at < ?", (now - MAX_ENTRY_AGE,))
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to write reference cache {self.cache_file}: {e}")
+        finally:
+            conn.close()
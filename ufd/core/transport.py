@@ -1,68 +1,132 @@
-"""LSP Transport via Async Stdio."""
+"""LSP Transport via async streams (subprocess stdio or a unix socket)."""
 
 import asyncio
 import json
 import logging
+import re
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, stdlib json is the fallback
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_CONTENT_LENGTH_RE = re.compile(rb"(?i)content-length[ \t]*:[ \t]*(\d+)")
+# Bytes kept from dropped garbage, enough for a header with a Content-Type line
+_HEADER_CARRY = 256
 
-class AsyncStdioTransport:
-    """Handles JSON-RPC transport for LSP communication."""
+# How vscode-jsonrpc based servers like basedpyright serialize diagnostics, the
+# busiest notification and one nothing here uses. Recognizing it from raw bytes
+# saves decoding it; differently formatted ones are still decoded and ignored.
+_DIAGNOSTICS_PREFIX = b'{"jsonrpc":"2.0","method":"textDocument/publishDiagnostics"'
 
-    def __init__(self, proc: asyncio.subprocess.Process) -> None:
-        self.proc = proc
-        self._buffer: bytes = b""
-        self._stderr_task: asyncio.Task[None] | None = None
+
+def _dumps(payload: dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC payload to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(body: bytes) -> Any:
+    """Deserialize a JSON-RPC body from bytes."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class AsyncStreamTransport:
+    """Handles JSON-RPC transport for LSP communication over a pair of streams."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open_unix(cls, socket_path: str) -> "AsyncStreamTransport":
+        """Connect to an LSP endpoint listening on a unix domain socket."""
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        return cls(reader, writer)
 
     async def send(self, payload: dict[str, Any]) -> None:
         """Send a JSON-RPC payload to the LSP server."""
-        if self.proc.stdin is None:
-            raise RuntimeError("Stdin is closed")
-        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        if self.writer.is_closing():
+            raise RuntimeError("Stream is closed")
+        body = _dumps(payload)
         header = f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
-        self.proc.stdin.write(header + body)
-        await self.proc.stdin.drain()
+        # Hand both buffers over without first copying the body into a joined one
+        self.writer.writelines((header, body))
+        await self.writer.drain()
 
     async def read_message(self) -> dict[str, Any] | None:
-        """Reads one LSP message from stdout."""
+        """Reads one LSP message from the stream, skipping diagnostics notifications."""
+        reader = self.reader
+        carry = b""
         while True:
-            header_end = self._buffer.find(b"\r\n\r\n")
-            if header_end != -1:
-                header = self._buffer[:header_end].decode("ascii", errors="replace")
-                rest = self._buffer[header_end + 4 :]
-                content_length = None
-                for line in header.split("\r\n"):
-                    if line.lower().startswith("content-length:"):
-                        try:
-                            content_length = int(line.split(":", 1)[1].strip())
-                        except ValueError:
-                            pass
-                        break
-
-                if content_length is None:
-                    self._buffer = rest  # Discard invalid header
-                    continue
-
-                if len(rest) >= content_length:
-                    body = rest[:content_length]
-                    self._buffer = rest[content_length:]
-                    try:
-                        return json.loads(body.decode("utf-8"))
-                    except json.JSONDecodeError:
-                        logger.debug("Failed to parse JSON body from LSP server")
-                        continue
-
-            # Read more data
-            assert self.proc.stdout is not None
-            data = await self.proc.stdout.read(4096)
-            if not data:
+            try:
+                header_bytes = carry + await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                # No header terminator within the limit, drop the garbage and resync.
+                # Its tail may be the start of the next header, so keep that
+                dropped = await reader.readexactly(e.consumed)
+                carry = dropped[-_HEADER_CARRY:]
+                continue
+            carry = b""
+
+            match = _CONTENT_LENGTH_RE.search(header_bytes)
+            if match is None:
+                continue  # Discard invalid header
+
+            try:
+                body = await reader.readexactly(int(match.group(1)))
+            except asyncio.IncompleteReadError:
                 return None
-            self._buffer += data
+
+            if body.startswith(_DIAGNOSTICS_PREFIX):
+                continue
+
+            try:
+                return _loads(body)
+            except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
+                logger.debug("Failed to parse JSON body from LSP server")
+                continue
+
+    async def close(self) -> None:
+        """Close the transport and cleanup."""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class AsyncStdioTransport(AsyncStreamTransport):
+    """Handles JSON-RPC transport with an LSP server subprocess over stdio."""
+
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        if proc.stdin is None or proc.stdout is None:
+            raise RuntimeError("LSP server stdio is not piped")
+        super().__init__(proc.stdout, proc.stdin)
+        self.proc = proc
+        self._stderr_task: asyncio.Task[None] | None = None
+        if proc.stderr is not None:
+            self._stderr_task = asyncio.create_task(self._drain_stderr(proc.stderr))
+
+    async def _drain_stderr(self, stderr: asyncio.StreamReader) -> None:
+        """Keep reading the server's stderr, so a full pipe can never block it."""
+        # Chunks rather than lines, as one overlong line would end readline()
+        while chunk := await stderr.read(65536):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LSP server stderr: %s", chunk.decode(errors="replace").rstrip())
 
     async def close(self) -> None:
         """Close the transport and cleanup."""
+        if self._stderr_task is not None:
+            self._stderr_task.cancel()
         if self.proc.stdin is not None:
             self.proc.stdin.close()
         await self.proc.wait()
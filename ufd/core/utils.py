@@ -4,12 +4,17 @@ from __future__ import annotations
 
 import ast
 import logging
+import os
+import re
+from collections import Counter
 from pathlib import Path
 
 from ufd.core.models import DecoratorInfo, FunctionInfo
 
 logger = logging.getLogger(__name__)
 
+IDENTIFIER_RE = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+
 
 def extract_functions(
     content: str,
@@ -18,7 +23,8 @@ def extract_functions(
     """
     Parse Python source code and extract only top-level (module-level) functions.
     Excludes class methods and nested functions. All indices are 0-based.
-    The `start_char` points to the first letter of the function name.
+    The `start_char` points to the first letter of the function name and
+    `end_line` is the last line of the function body.
 
     Args:
         content: Python source code
@@ -26,36 +32,41 @@ def extract_functions(
     """
     module = ast.parse(content, filename=file_uri, type_comments=True)
     functions: list[FunctionInfo] = []
-    lines = content.splitlines()
+    # Offset of the start of line `line_no`; top-level nodes come in source order,
+    # so it only ever moves forward. Lines end at "\n" only, unlike splitlines(),
+    # which also breaks at form feeds and other characters ast does not count
+    line_no, line_start = 0, 0
 
     for node in module.body:  # only top-level statements
         if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
             line_idx = node.lineno - 1
-            line = lines[line_idx]
-
-            # Find the function name manually
-            # Works for both `def` and `async def`
-            def_pos = line.find("def ")
-            async_pos = line.find("async def ")
-            if async_pos != -1:
-                name_start = async_pos + len("async def ")
-            elif def_pos != -1:
-                name_start = def_pos + len("def ")
-            else:
-                name_start = node.col_offset  # fallback
-
-            # Extract decorators
-            decorators = []
-            if hasattr(node, "decorator_list") and node.decorator_list:
-                for decorator in node.decorator_list:
-                    decorator_name = _extract_decorator_name(decorator)
-                    decorators.append(
-                        DecoratorInfo(
-                            name=decorator_name,
-                            start_line=decorator.lineno - 1,
-                            start_char=decorator.col_offset,
-                        )
+            while line_no < line_idx:
+                line_start = content.index("\n", line_start) + 1
+                line_no += 1
+            line_end = content.find("\n", line_start)
+            line = content[line_start:] if line_end == -1 else content[line_start:line_end]
+
+            # The name normally follows `def ` / `async def ` right at col_offset;
+            # only look further along the line for unusual spacing
+            keyword = "async def " if isinstance(node, ast.AsyncFunctionDef) else "def "
+            name_start = node.col_offset + len(keyword)
+            if not line.startswith(node.name, name_start):
+                # col_offset counts UTF-8 bytes, which overshoots after non-ASCII text
+                name_re = re.compile(rf"def\s+({re.escape(node.name)})\b")
+                name_match = name_re.search(line, node.col_offset) or name_re.search(line)
+                name_start = name_match.start(1) if name_match else node.col_offset
+
+            # Extract decorators; most functions have none and share the empty tuple
+            decorators: tuple[DecoratorInfo, ...] = ()
+            if node.decorator_list:
+                decorators = tuple(
+                    DecoratorInfo(
+                        name=_extract_decorator_name(decorator),
+                        start_line=decorator.lineno - 1,
+                        start_char=decorator.col_offset,
                     )
+                    for decorator in node.decorator_list
+                )
 
             functions.append(
                 FunctionInfo(
@@ -63,6 +74,7 @@ def extract_functions(
                     name=node.name,
                     start_line=line_idx,
                     start_char=name_start,
+                    end_line=(node.end_lineno or node.lineno) - 1,
                     decorators=decorators,
                 )
             )
@@ -70,6 +82,22 @@ def extract_functions(
     return functions
 
 
+def extract_functions_from_files(paths: list[Path]) -> list[list[FunctionInfo] | None]:
+    """
+    Read and parse each file, returning None for the ones that fail.
+
+    Meant to run in a worker process, so errors are not raised across the
+    process boundary; callers can retry failed files to report them.
+    """
+    results: list[list[FunctionInfo] | None] = []
+    for path in paths:
+        try:
+            results.append(extract_functions(path.read_bytes().decode("utf-8"), path.as_uri()))
+        except Exception:
+            results.append(None)
+    return results
+
+
 def _extract_decorator_name(decorator: ast.expr) -> str:
     """
     Extract the name of a decorator from AST node.
@@ -80,6 +108,9 @@ def _extract_decorator_name(decorator: ast.expr) -> str:
     Returns:
         String representation of the decorator name
     """
+    # Handle cases like @app.get("/path")
+    while isinstance(decorator, ast.Call):
+        decorator = decorator.func
     if isinstance(decorator, ast.Name):
         return decorator.id
     if isinstance(decorator, ast.Attribute):
@@ -91,10 +122,7 @@ def _extract_decorator_name(decorator: ast.expr) -> str:
             node = node.value
         if isinstance(node, ast.Name):
             parts.append(node.id)
-        return ".".join(reversed(parts))
-    if isinstance(decorator, ast.Call):
-        # Handle cases like @app.get("/path")
-        return _extract_decorator_name(decorator.func)
+        return ".".join(parts[::-1])
     return "unknown"
 
 
@@ -114,4 +142,98 @@ def iter_python_files(root: Path, include_tests: bool = False) -> list[Path]:
     if not include_tests:
         ignored_dirs.update({"tests", "test", "testing"})
 
-    return [p for p in root.rglob("*.py") if not any(part in ignored_dirs for part in p.parts)]
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Pruning in place keeps the walk out of ignored trees entirely
+        dirnames[:] = [d for d in dirnames if d not in ignored_dirs]
+        files.extend(Path(dirpath, f) for f in filenames if f.endswith(".py"))
+    return files
+
+
+def iter_indexed_python_files(root: Path) -> list[Path]:
+    """
+    Recursively collect the Python files the LSP server indexes under `root`.
+
+    References can come from any of them, including directories a scan skips,
+    like `migrations/` or `tests/`. Only what basedpyright excludes by default
+    is left out: `**/node_modules`, `**/__pycache__` and `**/.*`.
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d
+            for d in dirnames
+            if d not in {"node_modules", "__pycache__"} and not d.startswith(".")
+        ]
+        files.extend(
+            Path(dirpath, f) for f in filenames if f.endswith(".py") and not f.startswith(".")
+        )
+    return files
+
+
+def count_identifiers(content: bytes) -> Counter[bytes]:
+    """
+    Count identifier-like tokens in source code.
+
+    This is purely textual: names inside strings and comments are counted too,
+    which errs on the side of treating a name as used.
+    """
+    return Counter(IDENTIFIER_RE.findall(content))
+
+
+def get_cache_dir() -> Path:
+    """Return the directory used for ufd's on-disk caches."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / "ufd"
+
+
+def module_names(file_path: Path, root: Path) -> list[str]:
+    """
+    Return the dotted names `file_path` may be imported under.
+
+    The import root is unknown (e.g. with a `src/` layout), so every suffix of
+    the path relative to `root` is a candidate: `src/pkg/mod.py` gives
+    `src.pkg.mod`, `pkg.mod` and `mod`.
+    """
+    parts = list(file_path.relative_to(root).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+
+def find_imported_modules(content: bytes, package: tuple[str, ...]) -> set[str]:
+    """
+    Collect the modules a file imports, resolving relative imports against `package`.
+
+    Imports are taken from the AST, so nested, continued and `;`-separated ones
+    count too. Deliberately generous: every parent package and every name
+    imported from a module is included, as any of them may be a module.
+
+    Raises:
+        SyntaxError: If the file can't be parsed, leaving its imports unknown
+    """
+    imported: set[str] = set()
+    if b"import" not in content:
+        return imported
+
+    def add(parts: list[str]) -> None:
+        for i in range(1, len(parts) + 1):
+            imported.add(".".join(parts[:i]))
+
+    for node in ast.walk(ast.parse(content)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                add(alias.name.split("."))
+        elif isinstance(node, ast.ImportFrom):
+            parts = node.module.split(".") if node.module else []
+            if node.level:
+                levels_up = node.level - 1
+                if levels_up > len(package):
+                    continue
+                parts = list(package[: len(package) - levels_up]) + parts
+            add(parts)
+            for alias in node.names:
+                add([*parts, alias.name])
+
+    return imported
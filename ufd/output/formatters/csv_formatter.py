@@ -2,6 +2,8 @@
 
 import csv
 from io import StringIO
+from pathlib import Path
+from typing import TextIO
 
 from ufd.core.models import ScanResult
 from ufd.output.formatters.protocols import BaseFormatter
@@ -13,22 +15,22 @@ class CsvFormatter(BaseFormatter):
     def format(self, result: ScanResult) -> str:
         """Format scan results as CSV."""
         output = StringIO()
+        self._write(result, output)
+        return output.getvalue()
+
+    def save(self, result: ScanResult, output_file: Path) -> None:
+        """Write scan results straight to a CSV file, without building the whole text first."""
+        with output_file.open("w", encoding="utf-8", newline="") as f:
+            self._write(result, f)
+
+    def _write(self, result: ScanResult, output: TextIO) -> None:
         writer = csv.writer(output)
 
         # Write header
         writer.writerow(["File", "Function", "Line", "Character"])
 
-        # Write data
-        for func in result.unused_functions:
-            # Convert file URI to relative path
-            file_path = func.file_uri.removeprefix("file://")
-            writer.writerow(
-                [
-                    file_path,
-                    func.name,
-                    func.start_line + 1,  # Convert to 1-based
-                    func.start_char,
-                ]
-            )
-
-        return output.getvalue()
+        # Write data, converting file URIs to paths and lines to 1-based
+        writer.writerows(
+            (func.file_uri.removeprefix("file://"), func.name, func.start_line + 1, func.start_char)
+            for func in result.unused_functions
+        )
@@ -7,10 +7,10 @@ from ufd.output.formatters.tree_formatter import TreeFormatter
 
 def get_formatter(output_format: OutputFormat) -> BaseFormatter:
     """Get the appropriate formatter for the output format."""
-    formatters = {
-        OutputFormat.TREE: TreeFormatter(),
-        OutputFormat.JSON: JsonFormatter(),
-        OutputFormat.CSV: CsvFormatter(),
-    }
-
-    return formatters[output_format]
+    match output_format:
+        case OutputFormat.TREE:
+            return TreeFormatter()
+        case OutputFormat.JSON:
+            return JsonFormatter()
+        case OutputFormat.CSV:
+            return CsvFormatter()
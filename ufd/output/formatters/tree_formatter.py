@@ -39,15 +39,15 @@ class TreeFormatter(BaseFormatter):
         )
 
         dir_nodes: dict[tuple[str, ...], Tree] = {(): root_tree}
+        cwd = Path.cwd()
 
-        for file_uri in sorted(funcs_by_file.keys()):
-            file_funcs = funcs_by_file[file_uri]
+        for file_uri, file_funcs in sorted(funcs_by_file.items()):
             file_funcs.sort(key=lambda f: (f.start_line, f.start_char))
 
             raw = file_uri.removeprefix("file://")
             p = Path(raw)
             try:
-                rel = p.relative_to(Path.cwd())
+                rel = p.relative_to(cwd)
             except ValueError:
                 rel = p
 
@@ -59,14 +59,13 @@ class TreeFormatter(BaseFormatter):
             parent_node: Tree = root_tree
             for part in parts[:-1]:
                 key = (*parent_key, part)
-                if key not in dir_nodes:
+                node = dir_nodes.get(key)
+                if node is None:
                     # Folder node (with trailing slash)
-                    parent_node = parent_node.add(
+                    node = dir_nodes[key] = parent_node.add(
                         f"[bold blue]{part}/[/bold blue]", guide_style="dim"
                     )
-                    dir_nodes[key] = parent_node
-                else:
-                    parent_node = dir_nodes[key]
+                parent_node = node
                 parent_key = key
 
             file_name = parts[-1]